@@ -4,6 +4,12 @@ import argparse
 import sys
 import os
 import math
+import re
+import collections
+import hashlib
+import shutil
+import functools
+import tempfile
 
 import cairo
 
@@ -14,6 +20,15 @@ DOC_HEIGHT = 2383  # 841mm / 33 1/8 inches
 
 DOC_NAME = "life_calendar.pdf"
 
+# Finished PDFs are cached here, keyed by the inputs that produced them. Only
+# the most recently used CACHE_MAX_FILES PDFs are kept.
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                         'life_calendar')
+CACHE_MAX_FILES = 20
+
+# Measured to tell which font FONT actually resolves to on this system
+FONT_PROBE_TEXT = "The quick brown fox jumps over the lazy dog 0123456789"
+
 KEY_NEWYEAR_DESC = "First week of the new year"
 KEY_BIRTHDAY_DESC = "Week of Tom's birthday"
 
@@ -44,6 +59,34 @@ BIRTHDAY_COLOUR = (0.5, 0.5, 0.5)
 NEWYEAR_COLOUR = (0.8, 0.8, 0.8)
 DARKENED_COLOUR_DELTA = (-0.4, -0.4, -0.4)
 
+# Per-week fill codes, as stored by precompute_fills
+FILL_NONE = 0
+FILL_BIRTHDAY = 1
+FILL_NEWYEAR = 2
+FILL_DARKENED = 4
+
+# Maps every fill code to itself with FILL_DARKENED set, for bytes.translate
+DARKEN_TABLE = bytes(code | FILL_DARKENED for code in range(256))
+
+FILL_COLOURS = {
+    FILL_NONE: (1, 1, 1),
+    FILL_BIRTHDAY: BIRTHDAY_COLOUR,
+    FILL_NEWYEAR: NEWYEAR_COLOUR,
+}
+
+# Darkened version of each fill colour, for weeks before the darken-until date
+DARKENED_COLOURS = {
+    fill: tuple(c + d for c, d in zip(fill, DARKENED_COLOUR_DELTA))
+    for fill in FILL_COLOURS.values()
+}
+
+# Shortened Steve Jobs quote, split into two balanced lines
+QUOTE_LINES = (
+    '"Remembering that I\'ll be dead soon is the most important tool I\'ve ever encountered to help me make the big choices in life. Because almost everything—all',
+    'external expectations, all pride, all fear of embarrassment or failure—these things just fall away in the face of death, leaving only what is truly important."'
+)
+ATTRIBUTION = "— Steve Jobs, 2005 Stanford University Commencement Speech"
+
 ARROW_HEAD_LENGTH = 36
 ARROW_HEAD_WIDTH = 8
 
@@ -62,24 +105,118 @@ def parse_date(date):
     raise ValueError("Incorrect date format: must be dd-mm-yyyy or dd/mm/yyyy")
 
 
-def draw_square(ctx, pos_x, pos_y, box_size, fillcolour=(1, 1, 1)):
+def draw_squares(ctx, squares, box_size):
     """
-    Draws a square at pos_x,pos_y
+    Draws a batch of squares, given as (pos_x, pos_y, fillcolour) tuples.
+    All borders go into a single path, and the squares are then filled
+    with one path per fill colour
     """
 
+    by_colour = {}
+    for pos_x, pos_y, fillcolour in squares:
+        by_colour.setdefault(fillcolour, []).append((pos_x, pos_y))
+
     ctx.set_line_width(BOX_LINE_WIDTH)
     ctx.set_source_rgb(0, 0, 0)
-    ctx.move_to(pos_x, pos_y)
+    for pos_x, pos_y, _ in squares:
+        ctx.rectangle(pos_x, pos_y, box_size, box_size)
+    ctx.stroke()
 
-    ctx.rectangle(pos_x, pos_y, box_size, box_size)
-    ctx.stroke_preserve()
+    # Fill after stroking, so the fill covers the inner half of each border
+    for fillcolour, positions in by_colour.items():
+        ctx.set_source_rgb(*fillcolour)
+        for pos_x, pos_y in positions:
+            ctx.rectangle(pos_x, pos_y, box_size, box_size)
+        ctx.fill()
 
-    ctx.set_source_rgb(*fillcolour)
-    ctx.fill()
+
+class TextMeasurer(object):
+    """
+    Wraps a cairo.Context and keeps track of the currently selected font, so
+    that text extents can be cached per font and string
+    """
+
+    def __init__(self, ctx):
+        self._ctx = ctx
+        self._font_face = None
+        self._font_size = None
+        self._saved_fonts = []
+
+    def __getattr__(self, name):
+        return getattr(self._ctx, name)
+
+    def save(self):
+        self._ctx.save()
+        self._saved_fonts.append((self._font_face, self._font_size))
+
+    def restore(self):
+        self._ctx.restore()
+        self._font_face, self._font_size = self._saved_fonts.pop()
+
+    def select_font_face(self, family, slant, weight):
+        self._ctx.select_font_face(family, slant, weight)
+        self._font_face = (family, slant, weight)
+
+    def set_font_size(self, size):
+        self._ctx.set_font_size(size)
+        self._font_size = size
+
+    # The font can't be identified after these, so text measured with it is
+    # not cached until the next select_font_face/set_font_size
+
+    def set_font_face(self, font_face):
+        self._ctx.set_font_face(font_face)
+        self._font_face = None
+
+    def set_font_matrix(self, matrix):
+        self._ctx.set_font_matrix(matrix)
+        self._font_size = None
+
+    def set_scaled_font(self, scaled_font):
+        self._ctx.set_scaled_font(scaled_font)
+        self._font_face = None
+        self._font_size = None
+
+    @property
+    def font_key(self):
+        """
+        (family, slant, weight, size) of the current font, or None if unknown
+        """
+        if (self._font_face is None) or (self._font_size is None):
+            return None
+
+        return self._font_face + (self._font_size,)
+
+
+TEXT_EXTENTS_CACHE_SIZE = 4096
+
+# (family, slant, weight, size, text) -> text extents, least recently used first
+_text_extents_cache = collections.OrderedDict()
+
+
+def get_text_extents(ctx, text):
+    """
+    Returns ctx.text_extents(text), cached per font and string
+    """
+    font_key = ctx.font_key
+    if font_key is None:
+        return tuple(ctx.text_extents(text))
+
+    key = font_key + (text,)
+    extents = _text_extents_cache.get(key)
+
+    if extents is None:
+        extents = _text_extents_cache[key] = tuple(ctx.text_extents(text))
+        if len(_text_extents_cache) > TEXT_EXTENTS_CACHE_SIZE:
+            _text_extents_cache.popitem(last=False)
+    else:
+        _text_extents_cache.move_to_end(key)
+
+    return extents
 
 
 def text_size(ctx, text):
-    _, _, width, height, _, _ = ctx.text_extents(text)
+    _, _, width, height, _, _ = get_text_extents(ctx, text)
     return width, height
 
 
@@ -87,38 +224,48 @@ def wrap_text(ctx, text, max_width):
     """
     Wraps text to fit within max_width, returns list of lines
     """
-    words = text.split()
     lines = []
-    current_line = ""
-    
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        test_width, _ = text_size(ctx, test_line)
-        
-        if test_width <= max_width:
-            current_line = test_line
-        else:
-            if current_line:
-                lines.append(current_line)
-                current_line = word
-            else:
-                lines.append(word)  # Word too long, add anyway
-    
-    if current_line:
-        lines.append(current_line)
-    
-    return lines
+    line_start = None
+    line_end = None
+    single_spaced = True
+
+    def line_text():
+        # Slice the line straight out of text where possible, otherwise fall
+        # back to joining its words with single spaces
+        line = text[line_start:line_end]
+        return line if single_spaced else " ".join(line.split())
+
+    # Measure each word once and lay the line out from those extents: each
+    # word starts where the previous word and a space advanced to, and the
+    # line's width runs from the first word's ink to the last word's ink
+    space_advance = get_text_extents(ctx, " ")[4]
+    line_left = 0
+    line_advance = 0
+
+    for match in re.finditer(r'\S+', text):
+        x_bearing, _, width, _, x_advance, _ = get_text_extents(ctx, match.group())
+        word_x = line_advance + space_advance
+        test_width = word_x + x_bearing + width - line_left
+
+        if (line_start is not None) and (test_width <= max_width):
+            single_spaced = single_spaced and (text[line_end:match.start()] == " ")
+            line_end = match.end()
+            line_advance = word_x + x_advance
+            continue
 
+        if line_start is not None:
+            lines.append(line_text())
+
+        # Word too long for an empty line is added anyway
+        line_start = match.start()
+        line_end = match.end()
+        single_spaced = True
+        line_left = x_bearing
+        line_advance = x_advance
+
+    if line_start is not None:
+        lines.append(line_text())
 
-def create_quote_lines(ctx, text, target_width):
-    """
-    Creates two balanced lines for the shortened Steve Jobs quote
-    """
-    lines = [
-        '"Remembering that I\'ll be dead soon is the most important tool I\'ve ever encountered to help me make the big choices in life. Because almost everything—all',
-        'external expectations, all pride, all fear of embarrassment or failure—these things just fall away in the face of death, leaving only what is truly important."'
-    ]
-    
     return lines
 
 
@@ -137,21 +284,20 @@ def draw_justified_text(ctx, text, x, y, target_width, is_last_line=False):
     natural_width, _ = text_size(ctx, text)
     if natural_width < target_width * 0.75:  # If line is less than 75% of target width
         # Just center it instead of justifying
-        w, h = text_size(ctx, text)
-        ctx.move_to(x + (target_width / 2) - (w / 2), y)
+        ctx.move_to(x + (target_width / 2) - (natural_width / 2), y)
         ctx.show_text(text)
         return
     
     words = text.split()
     if len(words) <= 1:
         # Can't justify single word, just center it
-        w, h = text_size(ctx, text)
-        ctx.move_to(x + (target_width / 2) - (w / 2), y)
+        ctx.move_to(x + (target_width / 2) - (natural_width / 2), y)
         ctx.show_text(text)
         return
     
     # Calculate total width of all words without spaces
-    total_word_width = sum(text_size(ctx, word)[0] for word in words)
+    word_widths = [text_size(ctx, word)[0] for word in words]
+    total_word_width = sum(word_widths)
     
     # Calculate how much space we need to distribute
     total_space_needed = target_width - total_word_width
@@ -163,8 +309,7 @@ def draw_justified_text(ctx, text, x, y, target_width, is_last_line=False):
         ctx.move_to(current_x, y)
         ctx.show_text(word)
         
-        word_width, _ = text_size(ctx, word)
-        current_x += word_width
+        current_x += word_widths[i]
         
         # Add space after word (except for last word)
         if i < len(words) - 1:
@@ -172,32 +317,26 @@ def draw_justified_text(ctx, text, x, y, target_width, is_last_line=False):
 
 
 def back_up_to_sunday(date):
-    while date.weekday() != 6:
-        date -= datetime.timedelta(days=1)
-    return date
-
+    return date - datetime.timedelta(days=(date.weekday() + 1) % 7)
 
-def is_future(now, date):
-    return now < date
 
+def adjusted_birthday(year, month, day):
+    """
+    Returns (year, month, day) for a birthday in the given year, moving
+    leap year day birthdays to the 28th of February in non-leap years
+    """
+    if (month == 2) and (day == 29) and not calendar.isleap(year):
+        day = 28
 
-def is_current_week(now, month, day):
-    end = now + datetime.timedelta(weeks=1)
-    ret = []
-
-    for year in [now.year, now.year + 1]:
-        try:
-            date = datetime.datetime(year, month, day)
-        except ValueError as e:
-            if (month == 2) and (day == 29):
-                # Handle edge case for birthday being on leap year day
-                date = datetime.datetime(year, month, day - 1)
-            else:
-                raise e
+    return year, month, day
 
-        ret.append(now <= date < end)
 
-    return True in ret
+def get_yearly_ordinals(years, month, day):
+    """
+    Returns a dict mapping each year to the ordinal of month/day in that year
+    """
+    return {year: datetime.date(*adjusted_birthday(year, month, day)).toordinal()
+            for year in years}
 
 
 def parse_darken_until_date(date):
@@ -210,35 +349,61 @@ def parse_darken_until_date(date):
     return back_up_to_sunday(until_date)
 
 
-def get_darkened_fill(fill):
-    return tuple(map(sum, zip(fill, DARKENED_COLOUR_DELTA)))
-
-
-def draw_row(ctx, pos_y, birthdate, date, box_size, x_margin, darken_until_date):
+def precompute_fills(start_date, birthdate, age, darken_until_date):
+    """
+    Works out the fill code for every week of the calendar, returns a
+    bytearray with one FILL_* code per week
+    """
+    fills = bytearray(age * NUM_COLUMNS)
+    start_ord = start_date.toordinal()
+    end_ord = start_ord + (7 * len(fills))
+
+    years = range(start_date.year, datetime.date.fromordinal(end_ord).year + 1)
+    birthday_ordinals = get_yearly_ordinals(years, birthdate.month, birthdate.day)
+    newyear_ordinals = get_yearly_ordinals(years, 1, 1)
+
+    # Rather than checking every week, go straight to the week holding each
+    # new year's day and birthday. Birthdays go last, so they win when both
+    # fall in the same week.
+    for ordinals, code in ((newyear_ordinals, FILL_NEWYEAR),
+                           (birthday_ordinals, FILL_BIRTHDAY)):
+        for ordinal in ordinals.values():
+            week = (ordinal - start_ord) // 7
+            if 0 <= week < len(fills):
+                fills[week] = code
+
+    if darken_until_date:
+        # Darken every week that starts before darken_until_date
+        darken_ord = darken_until_date.toordinal()
+        num_darkened = min(max(0, -((start_ord - darken_ord) // 7)), len(fills))
+        fills[:num_darkened] = fills[:num_darkened].translate(DARKEN_TABLE)
+
+    return fills
+
+
+def get_row_squares(pos_y, fills_row, box_size, x_margin):
     """
-    Draws a row of 52 squares, starting at pos_y
+    Returns the (pos_x, pos_y, fillcolour) tuples for a row of 52 squares,
+    starting at pos_y
     """
 
+    squares = []
     pos_x = x_margin
 
-    for i in range(NUM_COLUMNS):
-        fill = (1, 1, 1)
-
-        if is_current_week(date, birthdate.month, birthdate.day):
-            fill = BIRTHDAY_COLOUR
-        elif is_current_week(date, 1, 1):
-            fill = NEWYEAR_COLOUR
+    for code in fills_row:
+        fill = FILL_COLOURS[code & ~FILL_DARKENED]
 
-        if darken_until_date and is_future(date, darken_until_date):
-            fill = get_darkened_fill(fill)
+        if code & FILL_DARKENED:
+            fill = DARKENED_COLOURS[fill]
 
-        draw_square(ctx, pos_x, pos_y, box_size, fillcolour=fill)
+        squares.append((pos_x, pos_y, fill))
         pos_x += box_size + BOX_MARGIN
-        date += datetime.timedelta(weeks=1)
+
+    return squares
 
 
 def draw_key_item(ctx, pos_x, pos_y, desc, box_size, colour):
-    draw_square(ctx, pos_x, pos_y, box_size, fillcolour=colour)
+    draw_squares(ctx, [(pos_x, pos_y, colour)], box_size)
     pos_x += box_size + (box_size / 2)
 
     ctx.set_source_rgb(0, 0, 0)
@@ -249,7 +414,7 @@ def draw_key_item(ctx, pos_x, pos_y, desc, box_size, colour):
     return pos_x + w + (box_size * 2)
 
 
-def draw_grid(ctx, date, birthdate, age, darken_until_date):
+def draw_grid(ctx, date, birthdate, age, darken_until_date, number_colour):
     """
     Draws the whole grid of 52x90 squares
     """
@@ -259,11 +424,10 @@ def draw_grid(ctx, date, birthdate, age, darken_until_date):
     box_size = (available_height / num_rows) - BOX_MARGIN
     x_margin = (DOC_WIDTH - ((box_size + BOX_MARGIN) * NUM_COLUMNS)) / 2
 
-    start_date = date
-    pos_x = x_margin / 4
-    pos_y = pos_x
+    fills = precompute_fills(date, birthdate, age, darken_until_date)
 
     # draw week numbers above top row
+    ctx.set_source_rgb(*number_colour)
     ctx.set_font_size(TINYFONT_SIZE)
     ctx.select_font_face(FONT, cairo.FONT_SLANT_NORMAL,
         cairo.FONT_WEIGHT_NORMAL)
@@ -277,14 +441,15 @@ def draw_grid(ctx, date, birthdate, age, darken_until_date):
         ctx.show_text(text)
         pos_x += box_size + BOX_MARGIN
 
-    ctx.set_font_size(TINYFONT_SIZE)
+    # Draw all row labels in one pass, font size and colour stay the same
     ctx.select_font_face(FONT, cairo.FONT_SLANT_ITALIC,
         cairo.FONT_WEIGHT_NORMAL)
+    ctx.set_source_rgb(0, 0, 0)
 
+    row_ord = date.toordinal()
     for i in range(num_rows):
         # Generate string for current date
-        ctx.set_source_rgb(0, 0, 0)
-        date_str = date.strftime('%d %b, %Y')
+        date_str = datetime.date.fromordinal(row_ord).strftime('%d %b, %Y')
         w, h = text_size(ctx, date_str)
 
         # Draw it in front of the current row
@@ -292,17 +457,114 @@ def draw_grid(ctx, date, birthdate, age, darken_until_date):
             pos_y + ((box_size / 2) + (h / 2)))
         ctx.show_text(date_str)
 
-        # Draw the current row
-        draw_row(ctx, pos_y, birthdate, date, box_size, x_margin, darken_until_date)
-
         # Increment y position and current date by 1 row/year
         pos_y += box_size + BOX_MARGIN
-        date += datetime.timedelta(weeks=52)
+        row_ord += 7 * NUM_COLUMNS
+
+    # Draw all rows of squares in one batch
+    squares = []
+    pos_y = Y_MARGIN
+    for i in range(num_rows):
+        row_start = i * NUM_COLUMNS
+        squares += get_row_squares(pos_y, fills[row_start:row_start + NUM_COLUMNS],
+                                   box_size, x_margin)
+        pos_y += box_size + BOX_MARGIN
+
+    draw_squares(ctx, squares, box_size)
 
     return x_margin, box_size
 
+@functools.lru_cache(maxsize=8)
+def draw_grid_recording(date, birthdate, age, darken_until_date, number_colour):
+    """
+    Draws the grid onto a recording surface, which can then be replayed onto
+    any calendar with the same dates. Returns (surface, x_margin, box_size)
+    """
+    recording = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA,
+                                       cairo.Rectangle(0, 0, DOC_WIDTH, DOC_HEIGHT))
+    ctx = TextMeasurer(cairo.Context(recording))
+    x_margin, box_size = draw_grid(ctx, date, birthdate, age, darken_until_date, number_colour)
+
+    return recording, x_margin, box_size
+
+
+@functools.lru_cache(maxsize=None)
+def get_render_digest():
+    """
+    Returns a digest of what, besides the calendar inputs, decides how a PDF
+    looks: this script's source, the cairo version, and the metrics of FONT as
+    it resolves on this system. Returns None if the source can't be read
+    """
+    try:
+        with open(__file__, 'rb') as fh:
+            source = fh.read()
+    except (NameError, OSError):
+        return None
+
+    ctx = cairo.Context(cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, None))
+    ctx.select_font_face(FONT, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+    ctx.set_font_size(BIGFONT_SIZE)
+    probe = tuple(ctx.text_extents(FONT_PROBE_TEXT))
+
+    digest = hashlib.blake2b(repr((cairo.cairo_version_string(), probe)).encode('utf-8'),
+                             digest_size=16)
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def get_cache_path(birthdate, title, age, darken_until_date, sidebar_text, subtitle_text):
+    """
+    Returns the path of the cached PDF for these calendar inputs, or None if
+    the cache can't be used
+    """
+    render_digest = get_render_digest()
+    if render_digest is None:
+        return None
+
+    darken_ord = darken_until_date.toordinal() if darken_until_date else None
+    key = (render_digest, birthdate.toordinal(), title, age, darken_ord, sidebar_text,
+           subtitle_text)
+
+    digest = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16)
+    return os.path.join(CACHE_DIR, '%s.pdf' % digest.hexdigest())
+
+
+def save_to_cache(filename, cache_path):
+    """
+    Copies a generated PDF into the cache, then removes the least recently
+    used PDFs beyond CACHE_MAX_FILES. Errors are ignored since the cache is
+    only an optimization
+    """
+    cache_dir = os.path.dirname(cache_path)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Copy to a unique temporary file first, so that concurrent runs can't
+        # write into the same file before it is moved into place
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with open(filename, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+
+        cached = []
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith('.pdf') and entry.is_file():
+                cached.append((entry.stat().st_mtime, entry.path))
+
+        cached.sort(reverse=True)
+        for _, path in cached[CACHE_MAX_FILES:]:
+            os.remove(path)
+    except OSError:
+        pass
+
+
 def gen_calendar(birthdate, title, age, filename, darken_until_date, sidebar_text=None,
-                 subtitle_text=None):
+                 subtitle_text=None, use_cache=False):
     if len(title) > MAX_TITLE_SIZE:
         raise ValueError("Title can't be longer than %d characters"
             % MAX_TITLE_SIZE)
@@ -311,9 +573,23 @@ def gen_calendar(birthdate, title, age, filename, darken_until_date, sidebar_tex
     if (age < MIN_AGE) or (age > MAX_AGE):
         raise ValueError("Invalid age, must be between %d and %d" % (MIN_AGE, MAX_AGE))
 
+    cache_path = None
+    if use_cache:
+        cache_path = get_cache_path(birthdate, title, age, darken_until_date, sidebar_text,
+                                    subtitle_text)
+
+    if (cache_path is not None) and os.path.isfile(cache_path):
+        try:
+            shutil.copyfile(cache_path, filename)
+            os.utime(cache_path)  # Mark as recently used
+            return
+        except OSError:
+            # Can't use the cached PDF, render it instead
+            pass
+
     # Fill background with white
     surface = cairo.PDFSurface (filename, DOC_WIDTH, DOC_HEIGHT)
-    ctx = cairo.Context(surface)
+    ctx = TextMeasurer(cairo.Context(surface))
 
     ctx.set_source_rgb(1, 1, 1)
     ctx.rectangle(0, 0, DOC_WIDTH, DOC_HEIGHT)
@@ -338,39 +614,28 @@ def gen_calendar(birthdate, title, age, filename, darken_until_date, sidebar_tex
     ctx.show_text(title)
 
     # Draw Steve Jobs quote below title with better spacing
-    quote_text = "Remembering that I'll be dead soon is the most important tool I've ever encountered to help me make the big choices in life. Because almost everything—all external expectations, all pride, all fear of embarrassment or failure—these things just fall away in the face of death, leaving only what is truly important."
-    
-    # Add quotation marks
-    quote = f'"{quote_text}"'
-
     ctx.set_font_size(SMALLFONT_SIZE - 2)
     ctx.select_font_face(FONT, cairo.FONT_SLANT_ITALIC, cairo.FONT_WEIGHT_NORMAL)
     ctx.set_source_rgb(0.4, 0.4, 0.4)
 
-    # Create two balanced lines  
-    quote_lines = create_quote_lines(ctx, quote, 0)
-
     # Position quote with more space below title
     line_height = 22  # Increased from 18 for better readability
     start_y = title_y + 50  # More space between title and quote
-    quote_width = DOC_WIDTH - 400  # Width for justification
-    quote_start_x = (DOC_WIDTH / 2) - (quote_width / 2)
 
     # Draw each line of the quote - centered, no justification
-    for i, line in enumerate(quote_lines):
+    for i, line in enumerate(QUOTE_LINES):
         w, h = text_size(ctx, line)
         ctx.move_to((DOC_WIDTH / 2) - (w / 2), start_y + (i * line_height))
         ctx.show_text(line)
 
     # Add attribution with better spacing
-    attribution = "— Steve Jobs, 2005 Stanford University Commencement Speech"
     ctx.set_font_size(SMALLFONT_SIZE - 3)
     ctx.select_font_face(FONT, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
     ctx.set_source_rgb(0.6, 0.6, 0.6)
-    attr_w, attr_h = text_size(ctx, attribution)
-    attribution_y = start_y + (len(quote_lines) * line_height) + 15  # Adjusted for shorter quote
+    attr_w, attr_h = text_size(ctx, ATTRIBUTION)
+    attribution_y = start_y + (len(QUOTE_LINES) * line_height) + 15  # Adjusted for shorter quote
     ctx.move_to((DOC_WIDTH / 2) - (attr_w / 2), attribution_y)
-    ctx.show_text(attribution)
+    ctx.show_text(ATTRIBUTION)
 
     if subtitle_text is not None:
         ctx.set_source_rgb(0.7, 0.7, 0.7)
@@ -381,8 +646,14 @@ def gen_calendar(birthdate, title, age, filename, darken_until_date, sidebar_tex
 
     date = back_up_to_sunday(birthdate)
 
-    # Draw 52x100 grid of squares
-    x_margin, box_size = draw_grid(ctx, date, birthdate, age, darken_until_date)
+    # Week numbers are drawn in the same colour as the text above them
+    number_colour = tuple(ctx.get_source().get_rgba()[:3])
+
+    # Draw 52x100 grid of squares, reusing the recorded grid for the same dates
+    grid, x_margin, box_size = draw_grid_recording(date, birthdate, age, darken_until_date,
+                                                   number_colour)
+    ctx.set_source_surface(grid, 0, 0)
+    ctx.paint()
 
     if sidebar_text is not None:
         # Draw text on sidebar
@@ -391,9 +662,10 @@ def gen_calendar(birthdate, title, age, filename, darken_until_date, sidebar_tex
         ctx.set_source_rgb(0.7, 0.7, 0.7)
         w, h = text_size(ctx, sidebar_text)
         ctx.move_to((DOC_WIDTH - x_margin) + 20, Y_MARGIN + w + 100)
+        ctx.save()
         ctx.rotate(-90 * math.pi / 180)
         ctx.show_text(sidebar_text)
-        ctx.rotate(90 * math.pi / 180)  # Rotate back
+        ctx.restore()  # Undo the rotation
 
     # Draw the key at bottom with proper positioning
     box_size_key = 20  # Fixed size for key boxes
@@ -415,6 +687,10 @@ def gen_calendar(birthdate, title, age, filename, darken_until_date, sidebar_tex
     draw_key_item(ctx, pos_x, key_y, KEY_NEWYEAR_DESC, box_size_key, NEWYEAR_COLOUR)
 
     ctx.show_page()
+    surface.finish()
+
+    if cache_path is not None:
+        save_to_cache(filename, cache_path)
 
 
 def main():
@@ -450,12 +726,17 @@ def main():
                          nargs='?', const='today', default='today', help='Darken until date. '
                         '(defaults to today if argument is not given)')
 
+    parser.add_argument('-n', '--no-cache', action='store_false', dest='use_cache',
+                        help='Always render the calendar, instead of reusing a previously '
+                        'generated PDF for the same inputs')
+
     args = parser.parse_args()
     doc_name = '%s.pdf' % (os.path.splitext(args.filename)[0])
 
     try:
         gen_calendar(args.date, args.title, args.age, doc_name, args.darken_until_date,
-                     sidebar_text=args.sidebar_text, subtitle_text=args.subtitle_text)
+                     sidebar_text=args.sidebar_text, subtitle_text=args.subtitle_text,
+                     use_cache=args.use_cache)
     except Exception as e:
         print("Error: %s" % e)
         return